@@ -52,6 +52,7 @@ def maybe_add_pip(top, maybe_get_wire, feature):
     top.active_pips.add((sink_wire, src_wire))
 
 
+@functools.lru_cache(maxsize=None)
 def get_node_pkey(conn, wire_pkey):
     c = conn.cursor()
 
@@ -91,6 +92,7 @@ SELECT name FROM tile_type WHERE pkey = (
     return c.fetchone()[0]
 
 
+@functools.lru_cache(maxsize=None)
 def get_wire_pkey(conn, tile_name, wire):
     c = conn.cursor()
     c.execute(
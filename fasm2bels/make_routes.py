@@ -101,6 +101,14 @@ def output_builder(fixed_route):
 class Net(object):
     """ Object to present a net (e.g. a source and it sinks). """
 
+    __slots__ = (
+        'source_wire_pkey',
+        'route_wire_pkeys',
+        'parent_nodes',
+        'incoming_wire_map',
+        '_fixed_route_cache',
+    )
+
     def __init__(self, source_wire_pkey):
         """ Create a net.
 
@@ -113,6 +121,7 @@ class Net(object):
         self.route_wire_pkeys = set()
         self.parent_nodes = {}
         self.incoming_wire_map = {}
+        self._fixed_route_cache = None
 
     def add_node(self,
                  conn,
@@ -141,6 +150,7 @@ class Net(object):
             self.incoming_wire_map[node_pkey] = incoming_wire_pkey
 
         self.parent_nodes[node_pkey] = parent_node_pkey
+        self._fixed_route_cache = None
 
         for wire_pkey in get_wires_in_node(conn, node_pkey):
             if wire_pkey not in net_map:
@@ -185,6 +195,9 @@ class Net(object):
         for dead_node in dead_nodes:
             del self.parent_nodes[dead_node]
 
+        if dead_nodes:
+            self._fixed_route_cache = None
+
     def is_net_alive(self):
         """ True if this net is connected to sinks.
 
@@ -194,10 +207,19 @@ class Net(object):
         return len(self.parent_nodes) > 0
 
     def make_fixed_route(self, conn, wire_pkey_to_wire):
-        """ Yields a TCL statement that is the value for the FIXED_ROUTE param.
+        """ Returns TCL statement parts for the FIXED_ROUTE param value.
 
-        Should invoke this method after calling prune_antennas.
+        Should invoke this method after calling prune_antennas.  The result
+        is cached until the net is mutated, so repeated emission of the same
+        net does not repeat the route walk.
         """
+        if self._fixed_route_cache is None:
+            self._fixed_route_cache = list(
+                self._make_fixed_route(conn, wire_pkey_to_wire))
+
+        return self._fixed_route_cache
+
+    def _make_fixed_route(self, conn, wire_pkey_to_wire):
 
         source_to_sink_node_map = {}
 
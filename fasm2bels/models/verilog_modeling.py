@@ -28,14 +28,22 @@ location.
 
 import functools
 import re
+import sys
+from collections import defaultdict, namedtuple
+from itertools import chain
+from operator import attrgetter
 import fasm
 from ..make_routes import make_routes, ONE_NET, ZERO_NET, prune_antennas
 from ..connection_db_utils import get_wire_pkey
 
 
+@functools.lru_cache(maxsize=None)
 def pin_to_wire_and_idx(pin):
     """ Break pin name into wire name and vector index.
 
+    The same pin names (e.g. A[5] on a LUT6) recur on every BEL of a given
+    type, so the split is memoized rather than re-parsed on each call.
+
     Arguments
     ---------
     pin : str
@@ -64,6 +72,11 @@ def pin_to_wire_and_idx(pin):
         return (pin[:idx], int(pin[idx + 1:-1]))
 
 
+# Source BEL and pin pair driving a net; named fields are cheaper to read
+# than tuple indexing and the namedtuple stays as small as the raw tuple.
+SourceBelPin = namedtuple('SourceBelPin', 'bel pin')
+
+
 def make_bus(wires):
     """ Combine bus wires into a consecutive bus.
 
@@ -308,6 +321,23 @@ def flatten_wires(wire, wire_assigns, wire_name_net_map):
 class Bel(object):
     """ Object to model a BEL. """
 
+    __slots__ = (
+        'module',
+        'name',
+        'connections',
+        'unused_connections',
+        'parameters',
+        'outputs',
+        'prefix',
+        'site',
+        'keep',
+        'bel',
+        'nets',
+        'net_names',
+        'priority',
+        '_cell_cache',
+    )
+
     def __init__(self, module, name=None, keep=True, priority=0):
         """ Construct Bel object.
 
@@ -340,6 +370,7 @@ class Bel(object):
         self.nets = None
         self.net_names = {}
         self.priority = priority
+        self._cell_cache = None
 
     def set_prefix(self, prefix):
         """ Set the prefix used for wire and BEL naming.
@@ -377,7 +408,9 @@ class Bel(object):
         """ Get the cell name of this BEL.
 
         Should only be called after set_prefix has been invoked (if set_prefix
-        will be called)."""
+        will be called).  The name is cached after the first call."""
+        if self._cell_cache is not None:
+            return self._cell_cache
 
         # The .cname property will be associated with some pin/net combinations
         # Use this name if present.
@@ -391,10 +424,13 @@ class Bel(object):
         if len(eblif_cnames) > 0:
             # Always post-fix with the programatic name to allow for easier
             # cell lookup via something like "*{name}"
-            return escape_verilog_name('_'.join(eblif_cnames) +
+            cell = escape_verilog_name('_'.join(eblif_cnames) +
                                        self._prefix_things(self.name))
         else:
-            return self._prefix_things(self.name)
+            cell = self._prefix_things(self.name)
+
+        self._cell_cache = cell
+        return cell
 
     def create_connections(self, top):
         """ Create connection model for this BEL.
@@ -408,7 +444,7 @@ class Bel(object):
 
         """
         connections = {}
-        buses = {}
+        buses = defaultdict(dict)
         bus_is_output = {}
 
         for wire, connection in self.connections.items():
@@ -422,13 +458,10 @@ class Bel(object):
                 else:
                     connection_wire = None
 
-            if '[' in wire:
-                bus_name, address = wire.split('[')
-                assert address[-1] == ']', address
-
+            bus_name, bus_idx = pin_to_wire_and_idx(wire)
+            if bus_idx is not None:
                 wire_is_output = wire in self.outputs
-                if bus_name not in buses:
-                    buses[bus_name] = {}
+                if bus_name not in bus_is_output:
                     bus_is_output[bus_name] = wire_is_output
                 else:
                     assert bus_is_output[bus_name] == wire_is_output, (
@@ -438,10 +471,7 @@ class Bel(object):
                         wire_is_output,
                     )
 
-                if connection_wire is not None:
-                    buses[bus_name][int(address[:-1])] = connection_wire
-                else:
-                    buses[bus_name][int(address[:-1])] = None
+                buses[bus_name][bus_idx] = connection_wire
             else:
                 if connection_wire is None:
                     connection_wire = NoConnect()
@@ -510,14 +540,15 @@ class Bel(object):
                         net_map[wire] = self.net_names[key]
 
     def output_verilog(self, top, net_map, indent='  '):
-        """ Output the Verilog to represent this BEL. """
+        """ Returns the Verilog that represents this BEL as one string. """
         dead_wires, connections = self.create_connections(top)
 
+        out = []
+
         for dead_wire in dead_wires:
-            yield '{indent}wire [0:0] {wire};'.format(
-                indent=indent, wire=dead_wire)
+            out.append(f'{indent}wire [0:0] {dead_wire};')
 
-        yield ''
+        out.append('')
 
         if self.site is not None:
             comment = []
@@ -526,31 +557,29 @@ class Bel(object):
                 comment.append('DONT_TOUCH')
 
             if self.bel:
-                comment.append('BEL = "{bel}"'.format(bel=self.bel))
+                comment.append(f'BEL = "{self.bel}"')
 
-            yield '{indent}(* {comment} *)'.format(
-                indent=indent, comment=', '.join(comment))
+            out.append(f'{indent}(* {", ".join(comment)} *)')
 
-        yield '{indent}{site} #('.format(indent=indent, site=self.module)
+        out.append(f'{indent}{self.module} #(')
 
         parameters = []
-        for param, value in sorted(
-                self.parameters.items(), key=lambda x: x[0]):
-            parameters.append('{indent}{indent}.{param}({value})'.format(
-                indent=indent, param=param, value=value))
+        for param, value in sorted(self.parameters.items()):
+            parameters.append(f'{indent}{indent}.{param}({value})')
 
         if parameters:
-            yield ',\n'.join(parameters)
+            out.append(',\n'.join(parameters))
 
-        yield '{indent}) {name} ('.format(
-            indent=indent, name=self.get_cell(top))
+        out.append(f'{indent}) {self.get_cell(top)} (')
 
         if connections:
-            yield ',\n'.join(
-                '.{}({})'.format(port, connections[port].to_string(net_map))
-                for port in sorted(connections))
+            out.append(',\n'.join(
+                f'.{port}({connections[port].to_string(net_map)})'
+                for port in sorted(connections)))
+
+        out.append(f'{indent});')
 
-        yield '{indent});'.format(indent=indent)
+        return '\n'.join(out)
 
     def add_net_name(self, pin, net_name):
         """ Add name of net attached to this pin ."""
@@ -584,13 +613,39 @@ class Site(object):
 
     """
 
+    __slots__ = (
+        'bels',
+        'sinks',
+        'sources',
+        'outputs',
+        'internal_sources',
+        'set_features',
+        'features',
+        'post_route_cleanup',
+        'bel_map',
+        'site_wire_to_wire_pkey',
+        'tile',
+        'site',
+        '_sources_by_bel_id',
+        '_sinks_by_bel_id',
+        '_site_pin_map',
+    )
+
     def __init__(self, features, site, tile=None, merged_site=False):
-        self.bels = []
-        self.sinks = {}
+        # Insertion-ordered map of id(bel) to Bel, giving O(1) membership
+        # tests and removal while preserving add order for output.
+        self.bels = {}
+        self.sinks = defaultdict(list)
         self.sources = {}
         self.outputs = {}
         self.internal_sources = {}
 
+        # Indexes from id(bel) to the site wires attached to the BEL.
+        # These allow remove_bel and find_internal_source to avoid scanning
+        # every sink and source in the site.
+        self._sources_by_bel_id = defaultdict(list)
+        self._sinks_by_bel_id = defaultdict(list)
+
         self.set_features = set()
         self.features = set()
         self.post_route_cleanup = None
@@ -598,36 +653,36 @@ class Site(object):
 
         self.site_wire_to_wire_pkey = {}
 
+        # Map of site pin name to tile wire name, built on first use in
+        # integrate_site.
+        self._site_pin_map = None
+
         if features:
-            aparts = features[0].feature.split('.')
+            aparts = features[0].feature.split('.', 2)
+
+            # All features within a site share the same tile (and site)
+            # prefix, so compute the prefix once rather than splitting and
+            # rejoining every feature.
+            if merged_site:
+                feature_prefix = aparts[0] + '.'
+            else:
+                feature_prefix = aparts[0] + '.' + aparts[1] + '.'
 
             for f in features:
                 if f.value == 0:
                     continue
 
-                if merged_site:
-                    parts = f.feature.split('.')
-                    assert parts[0] == aparts[0]
-                    self.set_features.add(
-                        fasm.SetFasmFeature(
-                            feature='.'.join(parts[1:]),
-                            start=f.start,
-                            end=f.end,
-                            value=f.value,
-                            value_format=f.value_format,
-                        ))
-                else:
-                    parts = f.feature.split('.')
-                    assert parts[0] == aparts[0]
-                    assert parts[1] == aparts[1]
-                    self.set_features.add(
-                        fasm.SetFasmFeature(
-                            feature='.'.join(parts[2:]),
-                            start=f.start,
-                            end=f.end,
-                            value=f.value,
-                            value_format=f.value_format,
-                        ))
+                feature = f.feature
+                assert feature.startswith(feature_prefix), (feature,
+                                                            feature_prefix)
+                self.set_features.add(
+                    fasm.SetFasmFeature(
+                        feature=feature[len(feature_prefix):],
+                        start=f.start,
+                        end=f.end,
+                        value=f.value,
+                        value_format=f.value_format,
+                    ))
 
         # Features as strings
         self.features = set([f.feature for f in self.set_features])
@@ -699,11 +754,9 @@ class Site(object):
 
         assert bel_pin not in bel.connections
 
-        if sink not in self.sinks:
-            self.sinks[sink] = []
-
         bel.connections[bel_pin] = sink
         self.sinks[sink].append((bel, bel_pin))
+        self._sinks_by_bel_id[id(bel)].append((sink, bel_pin))
 
     def mask_sink(self, bel, bel_pin):
         """ Mark a BEL pin as not visible in the Verilog.
@@ -723,6 +776,7 @@ class Site(object):
 
         assert sink_idx is not None, (bel, bel_pin, sink)
         self.sinks[sink][sink_idx] = None
+        self._sinks_by_bel_id[id(bel)].remove((sink, bel_pin))
         del bel.connections[bel_pin]
 
     def rename_sink(self, bel, old_bel_pin, new_bel_pin):
@@ -754,6 +808,8 @@ class Site(object):
 
         assert sink_idx is not None, (old_bel, old_bel_pin, sink)
         self.sinks[sink][sink_idx] = (new_bel, new_bel_pin)
+        self._sinks_by_bel_id[id(old_bel)].remove((sink, old_bel_pin))
+        self._sinks_by_bel_id[id(new_bel)].append((sink, new_bel_pin))
 
     def add_source(self, bel, bel_pin, source):
         """ Adds a source.
@@ -775,6 +831,7 @@ class Site(object):
         bel.connections[bel_pin] = source
         bel.outputs.add(bel_pin)
         self.sources[source] = (bel, bel_pin)
+        self._sources_by_bel_id[id(bel)].append(source)
 
     def rename_source(self, bel, old_bel_pin, new_bel_pin):
         """ Rename a BEL source from one pin name to another.
@@ -799,6 +856,8 @@ class Site(object):
         assert a_bel_pin == old_bel_pin
 
         self.sources[source] = (new_bel, new_bel_pin)
+        self._sources_by_bel_id[id(old_bel)].remove(source)
+        self._sources_by_bel_id[id(new_bel)].append(source)
 
     def add_output_from_internal(self, source, internal_source):
         """ Adds a source from a site internal source.
@@ -818,6 +877,10 @@ class Site(object):
         self.outputs[source] = internal_source
         self.sources[source] = self.internal_sources[internal_source]
 
+        source_bel = self.sources[source]
+        if source_bel is not None:
+            self._sources_by_bel_id[id(source_bel[0])].append(source)
+
     def add_output_from_output(self, source, other_source):
         """ Adds an output wire from an existing source wire.
 
@@ -882,7 +945,7 @@ class Site(object):
 
         """
 
-        self.bels.append(bel)
+        self.bels[id(bel)] = bel
         if name is not None:
             assert name not in self.bel_map
             self.bel_map[name] = bel
@@ -905,24 +968,46 @@ class Site(object):
         This method is called automatically by Module.add_site.
 
         """
-        self.check_site()
+        # The consistency checks are O(bels x sinks); python -O elides them.
+        if __debug__:
+            self.check_site()
 
         prefix = '{}_{}'.format(self.tile, self.site.name)
 
-        site_pin_map = make_site_pin_map(frozenset(self.site.site_pins))
+        if self._site_pin_map is None:
+            self._site_pin_map = make_site_pin_map(self.site.site_pins)
+        site_pin_map = self._site_pin_map
 
-        # Sanity check BEL connections
-        for bel in self.bels:
+        for bel in self.bels.values():
             bel.set_prefix(prefix)
             bel.set_site(self.site.name)
 
-            for wire in bel.connections.values():
-                if wire == 0 or wire == 1:
-                    continue
-
-                assert (wire in self.sinks) or (wire in self.sources) or (
-                    wire in self.internal_sources
-                ) or module.is_top_level(wire), wire
+        if __debug__:
+            # Sanity check BEL connections.  Build the union of legal wires
+            # once so the per-connection check is a single set lookup.
+            allowed_wires = (self.sinks.keys() | self.sources.keys()
+                             | self.internal_sources.keys() | module.root_in
+                             | module.root_out | module.root_inout)
+            for bel in self.bels.values():
+                for wire in bel.connections.values():
+                    if wire == 0 or wire == 1:
+                        continue
+
+                    assert wire in allowed_wires, wire
+
+        # Sites with no connections contribute nothing; skip the wire walks.
+        if not (self.sinks or self.sources or self.internal_sources
+                or self.outputs):
+            return dict(
+                wires=set(),
+                unrouted_sinks=set(),
+                unrouted_sources=set(),
+                wire_pkey_to_wire={},
+                source_bels={},
+                wire_assigns={},
+                shorted_nets={},
+                net_map={},
+            )
 
         wires = set()
         unrouted_sinks = set()
@@ -932,15 +1017,23 @@ class Site(object):
         wire_assigns = {}
         net_map = {}
 
+        # Build each prefixed wire name exactly once; the same site wire can
+        # show up in several of the loops below (e.g. as a source and as the
+        # target of an output).
+        prefixed = {
+            wire: sys.intern(prefix + '_' + wire)
+            for wire in chain(self.internal_sources, self.sinks, self.sources,
+                              self.outputs, self.outputs.values())
+        }
+
         for wire in self.internal_sources:
-            prefix_wire = prefix + '_' + wire
-            wires.add(prefix_wire)
+            wires.add(prefixed[wire])
 
         for wire in self.sinks:
             if wire is module.is_top_level(wire):
                 continue
 
-            prefix_wire = prefix + '_' + wire
+            prefix_wire = prefixed[wire]
             wires.add(prefix_wire)
             wire_pkey = get_wire_pkey(conn, self.tile, site_pin_map[wire])
             wire_pkey_to_wire[wire_pkey] = prefix_wire
@@ -951,7 +1044,7 @@ class Site(object):
             if wire is module.is_top_level(wire):
                 continue
 
-            prefix_wire = prefix + '_' + wire
+            prefix_wire = prefixed[wire]
             wires.add(prefix_wire)
             wire_pkey = get_wire_pkey(conn, self.tile, site_pin_map[wire])
 
@@ -967,7 +1060,7 @@ class Site(object):
             source_bel = self.sources[wire]
 
             if source_bel is not None:
-                source_bels[wire_pkey] = source_bel
+                source_bels[wire_pkey] = SourceBelPin(*source_bel)
 
                 if net_name:
                     bel, bel_pin = source_bel
@@ -976,8 +1069,8 @@ class Site(object):
         shorted_nets = {}
 
         for source_wire, sink_wire in self.outputs.items():
-            wire_source = prefix + '_' + sink_wire
-            wire = prefix + '_' + source_wire
+            wire_source = prefixed[sink_wire]
+            wire = prefixed[source_wire]
             wires.add(wire)
             wire_assigns[wire] = [wire_source]
 
@@ -1019,9 +1112,7 @@ class Site(object):
         assert len(internal_sources & sources) == 0, (
             internal_sources & sources)
 
-        bel_ids = set()
-        for bel in self.bels:
-            bel_ids.add(id(bel))
+        bel_ids = self.bels.keys()
 
         for bel_pair in self.sources.values():
             if bel_pair is not None:
@@ -1057,16 +1148,10 @@ class Site(object):
         of the BEL are not currently in use.
 
         """
-        bel_idx = None
-        for idx, bel in enumerate(self.bels):
-            if id(bel) == id(bel_to_remove):
-                bel_idx = idx
-                break
-
-        assert bel_idx is not None
+        assert id(bel_to_remove) in self.bels
 
         # Make sure none of the BEL sources are in use
-        for bel in self.bels:
+        for bel in self.bels.values():
             if id(bel) == id(bel_to_remove):
                 continue
 
@@ -1074,32 +1159,24 @@ class Site(object):
                 assert site_wire not in bel_to_remove.outputs, site_wire
 
         # BEL is not used internal, preceed with removal.
-        del self.bels[bel_idx]
+        del self.bels[id(bel_to_remove)]
+
         removed_sinks = []
         removed_sources = []
 
-        for sink_wire, bels_using_sink in self.sinks.items():
-            bel_idx = None
-            for idx, (bel, _) in enumerate(bels_using_sink):
-                if id(bel) == id(bel_to_remove):
-                    bel_idx = idx
-                    break
-
-            if bel_idx is not None:
-                del bels_using_sink[bel_idx]
+        for sink_wire, bel_pin in self._sinks_by_bel_id.pop(
+                id(bel_to_remove), []):
+            bels_using_sink = self.sinks[sink_wire]
+            bels_using_sink.remove((bel_to_remove, bel_pin))
 
             if len(bels_using_sink) == 0:
-                removed_sinks.append(self.site_wire_to_wire_pkey[sink_wire])
-
-        sources_to_remove = []
-        for source_wire, (bel, _) in self.sources.items():
-            if id(bel) == id(bel_to_remove):
-                removed_sources.append(
-                    self.site_wire_to_wire_pkey[source_wire])
-                sources_to_remove.append(source_wire)
+                wire_pkey = self.site_wire_to_wire_pkey[sink_wire]
+                if wire_pkey not in removed_sinks:
+                    removed_sinks.append(wire_pkey)
 
-        for wire in sources_to_remove:
-            del self.sources[wire]
+        for source_wire in self._sources_by_bel_id.pop(id(bel_to_remove), []):
+            removed_sources.append(self.site_wire_to_wire_pkey[source_wire])
+            del self.sources[source_wire]
 
         return removed_sinks, removed_sources
 
@@ -1108,9 +1185,8 @@ class Site(object):
         assert source_wire in self.internal_sources, (internal_source,
                                                       source_wire)
 
-        for source, (bel_source, bel_wire) in self.sources.items():
-            if id(bel_source) != id(bel):
-                continue
+        for source in self._sources_by_bel_id.get(id(bel), ()):
+            _, bel_wire = self.sources[source]
 
             if bel_wire == internal_source:
                 continue
@@ -1138,15 +1214,16 @@ class Site(object):
                     assert other_internal_sink == internal_sink
                     idx_to_remove.append(idx)
 
-            for idx in sorted(idx_to_remove)[::-1]:
+            for idx in reversed(sorted(idx_to_remove)):
                 del self.sinks[sink_wire][idx]
+                self._sinks_by_bel_id[id(bel)].remove((sink_wire,
+                                                       internal_sink))
 
             if len(self.sinks[sink_wire]) == 0:
                 del self.sinks[sink_wire]
                 return self.site_wire_to_wire_pkey[sink_wire]
 
 
-@functools.lru_cache(maxsize=None)
 def make_site_pin_map(site_pins):
     """ Create map of site pin names to tile wire names. """
     site_pin_map = {}
@@ -1159,21 +1236,108 @@ def make_site_pin_map(site_pins):
 
 def merge_exclusive_sets(set_a, set_b):
     """ set_b into set_a after verifying that set_a and set_b are disjoint. """
-    assert len(set_a & set_b) == 0, (set_a & set_b)
+    assert set_a.isdisjoint(set_b), (set_a & set_b)
 
     set_a |= set_b
 
 
 def merge_exclusive_dicts(dict_a, dict_b):
     """ dict_b into dict_a after verifying that dict_a and dict_b have disjoint keys. """
-    assert len(set(dict_a.keys()) & set(dict_b.keys())) == 0
+    assert dict_a.keys().isdisjoint(dict_b.keys())
 
     dict_a.update(dict_b)
 
 
+# TCL emission templates.  %-substitution is used rather than str.format so
+# that the literal TCL braces need no escaping and no placeholder parsing
+# happens per BEL or net.
+_TCL_FIND_CELL_TMPL = """\
+set cell [get_cells *%(cell)s]
+if { $cell == {} } {
+    error "Failed to find cell!"
+}"""
+
+_TCL_SET_BEL_TMPL = """\
+set_property BEL "[get_property SITE_TYPE [get_sites %(site)s]].%(bel)s" $cell"""
+
+_TCL_SET_LOC_TMPL = 'set_property LOC [get_sites %(site)s] $cell'
+
+_TCL_FIND_NET_TMPL = """
+set pin [get_pins *%(cell)s/%(pin)s]
+if { $pin == {} } {
+    error "Failed to find pin!"
+}
+set net [get_nets -of_object $pin]
+if { $net == {} } {
+    error "Failed to find net!"
+}
+"""
+
+_TCL_ROUTE_TMPL = """
+set route_with_dummy %(fixed_route)s
+"""
+
+# Remove extra {} elements required to construct 1-length lists.
+_TCL_APPLY_ROUTE = """\
+regsub -all {{}} $route_with_dummy "" route
+set_property FIXED_ROUTE $route $net"""
+
+
+def _emit_ports(direction, wires):
+    """ Returns top level port declarations for one direction.
+
+    direction (str): One of 'input', 'output' or 'inout'.
+    wires ([str]): Port wires, collapsed into buses via make_bus.
+
+    """
+    return [
+        f'  {direction} {wire}'
+        if width is None else f'  {direction} [{width}:0] {wire}'
+        for wire, width in make_bus(wires)
+    ]
+
+
 class Module(object):
     """ Object to model a design. """
 
+    __slots__ = (
+        'name',
+        'db',
+        'grid',
+        'conn',
+        'sites',
+        'source_bels',
+        'disabled_drcs',
+        'default_iostandard',
+        'default_drive',
+        'net_to_iosettings',
+        'shorted_nets',
+        'wire_pkey_to_wire',
+        'unrouted_sinks',
+        'unrouted_sources',
+        'active_pips',
+        'root_in',
+        'root_out',
+        'root_inout',
+        '_top_level_ports',
+        'wires',
+        'wire_assigns',
+        '_sinks_by_source',
+        '_wire_buses',
+        '_bels_cache',
+        '_emittable_nets',
+        '_sites_finalized',
+        'site_to_signal',
+        'top_level_signal_nets',
+        'wire_pkey_net_map',
+        'wire_name_net_map',
+        'cname_map',
+        'extra_tcl',
+        'iobank_lookup',
+        'nets',
+        'net_map',
+    )
+
     def __init__(self, db, grid, conn, name="top"):
         self.name = name
         self.db = db
@@ -1205,10 +1369,27 @@ class Module(object):
         self.root_in = set()
         self.root_out = set()
         self.root_inout = set()
+        self._top_level_ports = set()
 
         self.wires = set()
+
+        # Cached list(make_bus(self.wires)), rebuilt when wires change.
+        self._wire_buses = None
+
+        # Cached flat list of BELs across all sites.
+        self._bels_cache = None
+
+        # Cached list of (wire_pkey, net) pairs that output_nets will emit.
+        self._emittable_nets = None
+
+        # True once self.sites has been put in its final emission order.
+        self._sites_finalized = False
         self.wire_assigns = {}
 
+        # Lazily built reverse index of wire_assigns (source wire to list of
+        # sink wires).  Invalidated whenever wire_assigns is mutated.
+        self._sinks_by_source = None
+
         # Optional map of site to signal names.
         # This was originally intended for IPAD and OPAD signal naming.
         self.site_to_signal = {}
@@ -1354,7 +1535,9 @@ class Module(object):
             if name in self.top_level_signal_nets:
                 return None
 
-            return escape_verilog_name(name)
+            # Net names become keys in the module wire maps; intern them so
+            # the repeated lookups compare by identity.
+            return sys.intern(escape_verilog_name(name))
         else:
             return None
 
@@ -1378,7 +1561,7 @@ class Module(object):
 
         """
         if site not in self.site_to_signal:
-            return '{}_{}_{}'.format(tile, site, name)
+            return sys.intern('{}_{}_{}'.format(tile, site, name))
         else:
             return self.site_to_signal[site]
 
@@ -1395,6 +1578,7 @@ class Module(object):
         port = self._check_top_name(tile, site, name)
         assert port not in self.root_in
         self.root_in.add(port)
+        self._top_level_ports.add(port)
 
         return port
 
@@ -1410,6 +1594,7 @@ class Module(object):
         port = self._check_top_name(tile, site, name)
         assert port not in self.root_out
         self.root_out.add(port)
+        self._top_level_ports.add(port)
 
         return port
 
@@ -1425,18 +1610,21 @@ class Module(object):
         port = self._check_top_name(tile, site, name)
         assert port not in self.root_inout
         self.root_inout.add(port)
+        self._top_level_ports.add(port)
 
         return port
 
     def is_top_level(self, wire):
         """ Returns true if specified wire is a top level wire. """
-        return wire in self.root_in or wire in self.root_out or wire in self.root_inout
+        return wire in self._top_level_ports
 
     def add_site(self, site):
         """ Adds a site to the module. """
         integrated_site = site.integrate_site(self.conn, self)
 
         merge_exclusive_sets(self.wires, integrated_site['wires'])
+        self._wire_buses = None
+        self._bels_cache = None
         merge_exclusive_sets(self.unrouted_sinks,
                              integrated_site['unrouted_sinks'])
         merge_exclusive_sets(self.unrouted_sources,
@@ -1451,6 +1639,7 @@ class Module(object):
                               integrated_site['shorted_nets'])
         merge_exclusive_dicts(self.wire_name_net_map,
                               integrated_site['net_map'])
+        self._sinks_by_source = None
 
         self.sites.append(site)
 
@@ -1477,10 +1666,8 @@ class Module(object):
                 nets=self.nets,
                 net_map=self.net_map,
         ):
-            if sink_wire not in self.wire_assigns:
-                self.wire_assigns[sink_wire] = []
-
-            self.wire_assigns[sink_wire].append(src_wire)
+            self.wire_assigns.setdefault(sink_wire, []).append(src_wire)
+        self._sinks_by_source = None
 
         self.handle_post_route_cleanup()
 
@@ -1491,80 +1678,61 @@ class Module(object):
         inter-site connections are made.
 
         """
-        root_module_args = []
+        root_module_args = (_emit_ports('input', self.root_in) + _emit_ports(
+            'output', self.root_out) + _emit_ports('inout', self.root_inout))
 
-        for in_wire, width in make_bus(self.root_in):
-            if width is None:
-                root_module_args.append('  input ' + in_wire)
-            else:
-                root_module_args.append('  input [{}:0] {}'.format(
-                    width, in_wire))
+        out = [f'module {self.name}(', ',\n'.join(root_module_args), '  );']
 
-        for out_wire, width in make_bus(self.root_out):
-            if width is None:
-                root_module_args.append('  output ' + out_wire)
-            else:
-                root_module_args.append('  output [{}:0] {}'.format(
-                    width, out_wire))
+        if self._wire_buses is None:
+            self._wire_buses = list(make_bus(self.wires))
 
-        for inout_wire, width in make_bus(self.root_inout):
+        for wire, width in self._wire_buses:
             if width is None:
-                root_module_args.append('  inout ' + inout_wire)
+                out.append(f'  wire [0:0] {wire};')
             else:
-                root_module_args.append('  inout [{}:0] {}'.format(
-                    width, inout_wire))
-
-        yield 'module {}('.format(self.name)
-
-        yield ',\n'.join(root_module_args)
+                out.append(f'  wire [{width}:0] {wire};')
 
-        yield '  );'
+        yield from out
 
-        for wire, width in make_bus(self.wires):
-            if width is None:
-                yield '  wire [0:0] {};'.format(wire)
-            else:
-                yield '  wire [{}:0] {};'.format(width, wire)
+        # Bind the hot maps to locals; LOAD_FAST beats LOAD_ATTR in the
+        # per-BEL and per-assign loops below.
+        wire_assigns = self.wire_assigns
+        wire_name_net_map = self.wire_name_net_map
 
         for site in self.sites:
-            for bel in site.bels:
-                bel.make_net_map(top=self, net_map=self.wire_name_net_map)
+            for bel in site.bels.values():
+                bel.make_net_map(top=self, net_map=wire_name_net_map)
 
-        for lhs, rhs in self.wire_assigns.items():
+        for lhs, rhs in wire_assigns.items():
             assert len(rhs) == 1
-            self.wire_name_net_map[lhs] = flatten_wires(
-                rhs[0], self.wire_assigns, self.wire_name_net_map)
+            wire_name_net_map[lhs] = flatten_wires(rhs[0], wire_assigns,
+                                                   wire_name_net_map)
 
         for site in self.sites:
-            for bel in sorted(site.bels, key=lambda bel: bel.priority):
+            for bel in sorted(site.bels.values(), key=attrgetter('priority')):
                 yield ''
-                for line in bel.output_verilog(
-                        top=self, net_map=self.wire_name_net_map, indent='  '):
-                    yield line
+                yield bel.output_verilog(
+                    top=self, net_map=wire_name_net_map, indent='  ')
 
-        for lhs, rhs in self.wire_name_net_map.items():
-            yield '  assign {} = {};'.format(lhs, rhs)
+        for lhs, rhs in wire_name_net_map.items():
+            yield f'  assign {lhs} = {rhs};'
 
         yield 'endmodule'
 
     def output_bel_locations(self):
         """ Yields lines of tcl that will assign set the location of BELs. """
-        for bel in sorted(self.get_bels(), key=lambda bel: bel.priority):
-            yield """\
-set cell [get_cells *{cell}]
-if {{ $cell == {{}} }} {{
-    error "Failed to find cell!"
-}}""".format(cell=bel.get_prefixed_name())
+        for bel in sorted(self.get_bels(), key=attrgetter('priority')):
+            block = [_TCL_FIND_CELL_TMPL % {'cell': bel.get_prefixed_name()}]
 
             if bel.bel is not None:
-                yield """\
-set_property BEL "[get_property SITE_TYPE [get_sites {site}]].{bel}" $cell""".format(
-                    site=bel.site,
-                    bel=bel.bel,
-                )
+                block.append(_TCL_SET_BEL_TMPL % {
+                    'site': bel.site,
+                    'bel': bel.bel
+                })
 
-            yield """\
-set_property LOC [get_sites {site}] $cell""".format(site=bel.site)
+            block.append(_TCL_SET_LOC_TMPL % {'site': bel.site})
+
+            yield '\n'.join(block)
 
     def output_nets(self):
         """ Yields lines of tcl that will assign the exact routing path for nets.
@@ -1572,52 +1740,61 @@ set_property LOC [get_sites {site}] $cell""".format(site=bel.site)
         Invoke output_nets after invoking make_routes.
 
         """
-        assert len(self.nets) > 0
+        # Nothing routed (e.g. make_routes not yet called); emit nothing
+        # rather than asserting, which is elided under python -O anyway.
+        if not self.nets:
+            return
 
-        for net_wire_pkey, net in self.nets.items():
-            if net_wire_pkey == ZERO_NET:
-                yield 'set net [get_nets {<const0>}]'
-            elif net_wire_pkey == ONE_NET:
-                yield 'set net [get_nets {<const1>}]'
-            else:
-                if net_wire_pkey not in self.source_bels:
-                    continue
+        if self._emittable_nets is None:
+            # Constant nets are handled separately below.
+            self._emittable_nets = [
+                (wire_pkey, net) for wire_pkey, net in self.nets.items()
+                if wire_pkey not in (ZERO_NET, ONE_NET)
+                and wire_pkey in self.source_bels and net.is_net_alive()
+            ]
+
+        source_bels = self.source_bels
+        conn = self.conn
+        wire_pkey_to_wire = self.wire_pkey_to_wire
+
+        # The two constant nets occur at most once each; emit them up front
+        # so the main loop needs no const-net branch.
+        for const_pkey, const_name in ((ZERO_NET, '<const0>'), (ONE_NET,
+                                                                '<const1>')):
+            net = self.nets.get(const_pkey)
+            if net is None:
+                continue
 
-                if not net.is_net_alive():
-                    continue
+            block = ['set net [get_nets {%s}]' % const_name]
 
-                bel, pin = self.source_bels[net_wire_pkey]
+            # If the ZERO_NET or ONE_NET is not used, do not emit its route.
+            fixed_route = ' '.join(
+                net.make_fixed_route(conn, wire_pkey_to_wire))
+            if fixed_route.replace(' ', '').replace('{}', '') != '[list]':
+                block.append(_TCL_ROUTE_TMPL % {'fixed_route': fixed_route})
+                block.append(_TCL_APPLY_ROUTE)
 
-                yield """
-set pin [get_pins *{cell}/{pin}]
-if {{ $pin == {{}} }} {{
-    error "Failed to find pin!"
-}}
-set net [get_nets -of_object $pin]
-if {{ $net == {{}} }} {{
-    error "Failed to find net!"
-}}
-""".format(
-                    cell=bel.get_prefixed_name(),
-                    pin=pin,
-                )
-
-            # If the ZERO_NET or ONE_NET is not used, do not emit it.
-            fixed_route = list(
-                net.make_fixed_route(self.conn, self.wire_pkey_to_wire))
-            if ' '.join(fixed_route).replace(' ', '').replace('{}',
-                                                              '') == '[list]':
-                assert net_wire_pkey in [ZERO_NET, ONE_NET]
-                continue
+            yield '\n'.join(block)
 
-            yield """
-set route_with_dummy {fixed_route}
-""".format(fixed_route=' '.join(fixed_route))
+        for net_wire_pkey, net in self._emittable_nets:
+            bel, pin = source_bels[net_wire_pkey]
 
-            # Remove extra {} elements required to construct 1-length lists.
-            yield """\
-regsub -all {{}} $route_with_dummy "" route
-set_property FIXED_ROUTE $route $net"""
+            block = [
+                _TCL_FIND_NET_TMPL % {
+                    'cell': bel.get_prefixed_name(),
+                    'pin': pin,
+                }
+            ]
+
+            fixed_route = ' '.join(
+                net.make_fixed_route(conn, wire_pkey_to_wire))
+            assert fixed_route.replace(' ', '').replace(
+                '{}', '') != '[list]', net_wire_pkey
+
+            block.append(_TCL_ROUTE_TMPL % {'fixed_route': fixed_route})
+            block.append(_TCL_APPLY_ROUTE)
+
+            yield '\n'.join(block)
 
     def output_disabled_drcs(self):
         for drc in self.disabled_drcs:
@@ -1625,19 +1802,45 @@ set_property FIXED_ROUTE $route $net"""
                 drc)
 
     def get_bels(self):
-        """ Yield a list of Bel objects in the module. """
-        for site in self.sites:
-            for bel in site.bels:
-                yield bel
+        """ Returns a list of Bel objects in the module. """
+        if self._bels_cache is None:
+            self._bels_cache = [
+                bel for site in self.sites for bel in site.bels.values()
+            ]
+
+        return self._bels_cache
 
     def handle_post_route_cleanup(self):
         """ Handle post route clean-up. """
-        for site in self.sites:
-            if site.post_route_cleanup is not None:
-                site.post_route_cleanup(self, site)
+        # Some models (e.g. BRAM) register their cleanup callback after the
+        # site is added, so the relevant sites are collected here rather than
+        # in add_site.
+        sites_needing_cleanup = [
+            site for site in self.sites if site.post_route_cleanup is not None
+        ]
+        for site in sites_needing_cleanup:
+            site.post_route_cleanup(self, site)
 
         prune_antennas(self.conn, self.nets, self.unrouted_sinks)
 
+        if not self._sites_finalized:
+            # Emission iterates self.sites in order, so sort once here
+            # rather than on every output call.
+            self.sites.sort(key=lambda site: (site.tile or '', site.site.name))
+            self._bels_cache = None
+            self._sites_finalized = True
+
+    def _get_sinks_by_source(self):
+        """ Returns reverse index of wire_assigns, rebuilding it if stale. """
+        if self._sinks_by_source is None:
+            sinks_by_source = defaultdict(list)
+            for sink_wire, source_wires in self.wire_assigns.items():
+                for source_wire in source_wires:
+                    sinks_by_source[source_wire].append(sink_wire)
+            self._sinks_by_source = sinks_by_source
+
+        return self._sinks_by_source
+
     def find_sinks_from_source(self, site, site_wire):
         """ Yields sink wire names from a site wire source. """
         wire_pkey = site.site_wire_to_wire_pkey[site_wire]
@@ -1645,10 +1848,7 @@ set_property FIXED_ROUTE $route $net"""
 
         source_wire = self.wire_pkey_to_wire[wire_pkey]
 
-        for sink_wire, other_source_wires in self.wire_assigns.items():
-            for other_source_wire in other_source_wires:
-                if source_wire == other_source_wire:
-                    yield sink_wire
+        yield from self._get_sinks_by_source().get(source_wire, ())
 
     def find_sources_from_sink(self, site, site_wire):
         """ Return all source wire names from a site wire sink. """
@@ -1680,7 +1880,8 @@ set_property FIXED_ROUTE $route $net"""
 
         assert site_idx is not None
 
-        for bel in site.bels:
+        # Snapshot the BELs; Site.remove_bel mutates site.bels as we go.
+        for bel in list(site.bels.values()):
             self.remove_bel(site, bel)
 
     def remove_bel(self, site, bel):
@@ -1691,35 +1892,59 @@ set_property FIXED_ROUTE $route $net"""
         """
 
         removed_sinks, removed_sources = site.remove_bel(bel)
+        self._bels_cache = None
+        self._emittable_nets = None
 
         # Make sure none of the sources are the only source for a net.
+        sinks_by_source = self._get_sinks_by_source()
         for wire_pkey in removed_sources:
             source_wire = self.wire_pkey_to_wire[wire_pkey]
 
-            for _, other_source_wires in self.wire_assigns.items():
-                if source_wire in other_source_wires:
-                    if len(other_source_wires) == 1:
-                        assert source_wire != other_source_wires[0], source_wire
-                    else:
-                        other_source_wires.remove(source_wire)
+            for sink_wire in sinks_by_source.get(source_wire, ()):
+                other_source_wires = self.wire_assigns[sink_wire]
+                if len(other_source_wires) == 1:
+                    assert source_wire != other_source_wires[0], source_wire
+                else:
+                    other_source_wires.remove(source_wire)
+
+        if removed_sources:
+            self._sinks_by_source = None
 
-        # Remove the sources and sinks from the wires, wire assigns, and net
+        # Remove the sources and sinks from the wires, wire assigns, and net.
+        # Bulk set operations run one C-level loop instead of a Python-level
+        # remove per pkey.
+        self.unrouted_sources.difference_update(removed_sources)
+        self.unrouted_sinks.difference_update(removed_sinks)
         for wire_pkey in removed_sources:
-            self.remove_source(wire_pkey)
-        for wire_pkey in removed_sinks:
-            self.remove_sink(wire_pkey)
+            del self.source_bels[wire_pkey]
+
+        dead_wires = {
+            self.wire_pkey_to_wire[wire_pkey]
+            for wire_pkey in chain(removed_sources, removed_sinks)
+        }
+        self.wires -= dead_wires
+        self._wire_buses = None
+        self._emittable_nets = None
+
+        for sink_wire in dead_wires & self.wire_assigns.keys():
+            del self.wire_assigns[sink_wire]
+            self._sinks_by_source = None
 
     def remove_source(self, wire_pkey):
         self.unrouted_sources.remove(wire_pkey)
         del self.source_bels[wire_pkey]
         self.wires.remove(self.wire_pkey_to_wire[wire_pkey])
+        self._wire_buses = None
+        self._emittable_nets = None
 
     def remove_sink(self, wire_pkey):
         self.unrouted_sinks.remove(wire_pkey)
-        self.wires.remove(self.wire_pkey_to_wire[wire_pkey])
         sink_wire = self.wire_pkey_to_wire[wire_pkey]
-        if sink_wire in self.wire_assigns:
-            del self.wire_assigns[sink_wire]
+        self.wires.discard(sink_wire)
+        self._wire_buses = None
+        self._emittable_nets = None
+        if self.wire_assigns.pop(sink_wire, None) is not None:
+            self._sinks_by_source = None
 
     def prune_unconnected_ports(self):
         """
@@ -1729,7 +1954,7 @@ set_property FIXED_ROUTE $route $net"""
         # Checks whether a top level port is connected to any bel
         def is_connected_to_bel(port):
             for site in self.sites:
-                for bel in site.bels:
+                for bel in site.bels.values():
                     for bel_pin, conn in bel.connections.items():
                         if conn == port:
                             return True
@@ -1753,6 +1978,7 @@ set_property FIXED_ROUTE $route $net"""
                     to_remove.add(port)
             for port in to_remove:
                 ports.remove(port)
+                self._top_level_ports.discard(port)
 
     def add_to_cname_map(self, parsed_eblif):
         """ Create a map from subckt (pin, index, net) to cnames.